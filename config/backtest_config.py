@@ -7,19 +7,44 @@ class SellStrategy(Enum):
     INTRADAY_TARGET_STOPLOSS = 1  # 장중 익절(+2%) 및 손절(-1%)
     CLOSE_WITH_STOPLOSS = 2  # 종가 매도 + 장중 손절(-1%)
     CLOSE_ONLY = 3  # 종가 청산만
+    HOLD_MINUTES = 4  # 매수 후 N분 보유 후 청산
+    HOLD_DAYS = 5  # 매수 후 N 거래일 종가 청산 (오버나이트 보유)
+
+class CriteriaMode(Enum):
+    """기준(분위수) 산출 구간 선택"""
+    EXPANDING = 1  # CRITERIA_START_DATE ~ 전일 전체
+    ROLLING = 2  # 최근 N 일자 (매일 갱신)
+    WALK_FORWARD = 3  # 최근 N 일자 (K 거래일마다 재학습)
 
 class BacktestConfig:
     # 경로 설정
-    TIMESERIES_DATA_PATH = "../data"
+    # 스냅샷: 수집 원본 -> src/data_quality 보정본, 기준 산출(src/indicators)과 백테스트 모두 TIMESERIES_DATA_PATH 사용
+    RAW_TIMESERIES_DATA_PATH = "../data"
+    CLEAN_TIMESERIES_DATA_PATH = "../data_clean"
+    USE_CLEAN_DATA = True
+    TIMESERIES_DATA_PATH = CLEAN_TIMESERIES_DATA_PATH if USE_CLEAN_DATA else RAW_TIMESERIES_DATA_PATH
+    SKIP_FLAGGED_CODES = True  # 품질 리포트(_quality_report.csv)에서 정상이 아닌 종목은 기준 산출에서 제외
     VOLUME_RATIO_PATH_TEMPLATE = "../data/volume_ratio_data_{window}days.parquet"
     STRENGTH_DATA_PATH = "../data/strength_data.parquet"
     DAILY_VOLUME_PATH = "./data/daily_volume_data.pkl"
+    DAILY_CLOSE_PATH = "./data/daily_close_data.pkl"
+
+    # 스트리밍(Out-of-core) 백테스트: 파티션 파일을 일자 순으로 로드
+    STREAMING_MODE = False
+    VOLUME_RATIO_PARTITION_TEMPLATE = "../data/partitioned/volume_ratio_{window}days"
+    STRENGTH_PARTITION_PATH = "../data/partitioned/strength"
+    DAILY_VOLUME_PARTITION_PATH = "./data/partitioned/daily_volume"
 
     # 백테스트 기간
     TEST_START_DATE = "2025-08-29"
     TEST_END_DATE = "2025-11-28"
     CRITERIA_START_DATE = "2025-08-04"
 
+    # 기준 산출 구간 설정
+    CRITERIA_MODE = CriteriaMode.EXPANDING
+    CRITERIA_WINDOW_DAYS = 20 # ROLLING, WALK_FORWARD 윈도우 크기
+    WALK_FORWARD_RETRAIN_DAYS = 5 # WALK_FORWARD 재학습 주기
+
     # 거래 설정
     VOLUME_WINDOW_SIZE = 20
     INITIAL_BALANCE = 100_000_000
@@ -30,6 +55,8 @@ class BacktestConfig:
     SELL_STRATEGY = SellStrategy.CLOSE_WITH_STOPLOSS
     TARGET_PROFIT_RATE = 1.02 # +2%
     STOP_LOSS_RATE = 0.99 # -1%
+    HOLDING_MINUTES = 10 # HOLD_MINUTES 보유 시간(분)
+    HOLDING_DAYS = 1 # HOLD_DAYS 보유 기간(거래일, 0 = 당일 종가)
 
     # 성능 최적화
     MAX_WORKERS = 4
@@ -37,4 +64,18 @@ class BacktestConfig:
 
     # 시그널 시간
     SIGNAL_TIME_START = time(9, 1, 0)
-    SIGNAL_TIME_END = time(9, 59, 0)
\ No newline at end of file
+    SIGNAL_TIME_END = time(9, 59, 0)
+
+    # 매수 시그널 (strategies/signal_dsl 표현식)
+    # 누적체결강도 조건 - 시간별 3분위수
+    # BUY_SIGNAL_EXPR = "volume_ratio >= q3_volume & 누적강도 >= q3_strength & 전일대비 > 0"
+    # 누적체결강도 조건 - 전체 시간의 3분위수
+    BUY_SIGNAL_EXPR = "volume_ratio >= q3_volume & 누적강도 >= q3_strength_global & 전일대비 > 0"
+
+    # 비교용 후보 시그널 {이름: 표현식} - 매일 매수 시그널과 함께 전 종목 평가, 진입 종목 수만 집계
+    CANDIDATE_SIGNAL_EXPRS = {
+        'strength_by_time': "volume_ratio >= q3_volume & 누적강도 >= q3_strength & 전일대비 > 0",
+        'strength_global': "volume_ratio >= q3_volume & 누적강도 >= q3_strength_global & 전일대비 > 0",
+        'volume_only': "volume_ratio >= q3_volume & 전일대비 > 0",
+        'median': "volume_ratio >= median_volume & 누적강도 >= median_strength & 전일대비 > 0",
+    }
\ No newline at end of file
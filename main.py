@@ -1,9 +1,9 @@
-from strategies.buy_strategy import process_single_stock, load_stock_file_cached
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.partition_store import StreamingCriteria, InMemoryCriteria, StreamingVolumeWindow, get_peak_rss_mb
+from strategies.buy_strategy import load_day_signal_frames, scan_day_signals, build_buy_watchlist, load_stock_file_cached, BUY_SIGNAL, BUY_SIGNAL_NAME, CANDIDATE_SIGNALS
 from utils.metrics import calculate_mdd, calculate_sharpe_ratio
-from strategies.sell_strategy import execute_sell_strategy
+from strategies.sell_strategy import execute_sell_strategy, execute_horizon_exits, build_minute_price_matrix, load_close_price_matrix, HORIZON_SELL_STRATEGIES
 from src.utils import KoreaInvestEnv, KoreaInvestAPI
-from config.backtest_config import BacktestConfig
+from config.backtest_config import BacktestConfig, CriteriaMode
 import FinanceDataReader as fdr
 from loguru import logger
 import pandas as pd
@@ -42,52 +42,90 @@ def main(korea_invest_api, stock_codes):
     balance_history = []
     total_trade_result = {}
     total_stock_nums = 0
+    candidate_entry_nums = dict.fromkeys(CANDIDATE_SIGNALS, 0)
+    day_signals = {BUY_SIGNAL_NAME: BUY_SIGNAL, **CANDIDATE_SIGNALS}
 
     # 테스트 날짜 리스트
     test_date_lst = fdr.DataReader('005930', start=BacktestConfig.TEST_START_DATE, end=BacktestConfig.TEST_END_DATE).index.date
 
+    # 보유 기간 청산: 종가 행렬 1회 로드, 오버나이트 포지션 관리
+    horizon_exit = BacktestConfig.SELL_STRATEGY in HORIZON_SELL_STRATEGIES
+    if horizon_exit:
+        close_price_df = load_close_price_matrix(stock_codes, BacktestConfig.TEST_START_DATE, BacktestConfig.TEST_END_DATE)
+    open_positions = pd.DataFrame()  # 매도일 전 포지션 (종목코드, 보유수량, 매수가, 매도일, 매도가, 수익률, 매도금액)
+
+    start_date = pd.to_datetime(BacktestConfig.CRITERIA_START_DATE) # 훈련 날짜 시작일
+    criteria_mode = BacktestConfig.CRITERIA_MODE
+    window_days = None if criteria_mode == CriteriaMode.EXPANDING else BacktestConfig.CRITERIA_WINDOW_DAYS
+    use_criteria_stream = BacktestConfig.STREAMING_MODE or criteria_mode != CriteriaMode.EXPANDING
+    logger.info(f"기준 산출 구간: {criteria_mode.name}")
+
     # 거래량 데이터 로드
-    volume_data_df = pd.read_pickle(BacktestConfig.DAILY_VOLUME_PATH)
+    if BacktestConfig.STREAMING_MODE:
+        # 파티션에서 필요한 구간만 순차 로드
+        volume_stream = StreamingVolumeWindow(BacktestConfig.DAILY_VOLUME_PARTITION_PATH, BacktestConfig.VOLUME_WINDOW_SIZE)
+        volume_ratio_stream = StreamingCriteria(BacktestConfig.VOLUME_RATIO_PARTITION_TEMPLATE.format(window=BacktestConfig.VOLUME_WINDOW_SIZE), start_date, window_days)
+        strength_stream = StreamingCriteria(BacktestConfig.STRENGTH_PARTITION_PATH, start_date, window_days)
+    else:
+        volume_data_df = pd.read_pickle(BacktestConfig.DAILY_VOLUME_PATH)
+        if use_criteria_stream:
+            # 기준 데이터 1회 로드 후 슬라이딩 윈도우로 갱신
+            volume_ratio_stream = InMemoryCriteria(BacktestConfig.VOLUME_RATIO_PATH_TEMPLATE.format(window=BacktestConfig.VOLUME_WINDOW_SIZE), start_date, window_days)
+            strength_stream = InMemoryCriteria(BacktestConfig.STRENGTH_DATA_PATH, start_date, window_days)
 
     # 백테스트 루프
     for idx in range(1, len(test_date_lst)):
-        start_date = pd.to_datetime(BacktestConfig.CRITERIA_START_DATE) # 훈련 날짜 시작일
         end_date = pd.to_datetime(test_date_lst[idx - 1].strftime('%Y-%m-%d')) # 훈련 날짜 마지막일
         current_test_date = test_date_lst[idx] # 테스트 날짜
 
         logger.info(f"처리 중: {current_test_date} ({idx}/{len(test_date_lst) - 1})")
 
-        volume_ratio_df = set_criteria_df(BacktestConfig.VOLUME_RATIO_PATH_TEMPLATE.format(window=BacktestConfig.VOLUME_WINDOW_SIZE), start_date, end_date)
-        strength_df = set_criteria_df(BacktestConfig.STRENGTH_DATA_PATH, start_date, end_date)
-        criteria_df = pd.merge(
-            volume_ratio_df, strength_df,
-            on="시간", suffixes=('_volume', '_strength')
-        )
-        criteria_df['시간'] = pd.to_datetime(criteria_df['시간'], format='%H:%M:%S').dt.time
-
-        # 멀티스레딩으로 종목 처리
-        result_watchlist = []
-        with ThreadPoolExecutor(max_workers=BacktestConfig.MAX_WORKERS) as executor:
-            # 매수 처리
-            futures = {
-                executor.submit(
-                    process_single_stock,
-                    code, current_test_date, criteria_df, volume_data_df,
-                    BacktestConfig.VOLUME_WINDOW_SIZE, BacktestConfig.BUY_PRICE_PER_CODE
-                ): code for code in stock_codes
-            }
-
-            for future in as_completed(futures):
-                result = future.result()
-                if result:
-                    result_watchlist.append(result)
-                    balance -= result['보유수량'] * result['현재가']
-
-            # 매도 처리
-            trade_result = {}
+        if BacktestConfig.STREAMING_MODE:
+            volume_data_df = volume_stream.frame_until(current_test_date)
+
+        # WALK_FORWARD: K 거래일마다 재학습, 그 사이에는 직전 기준 유지
+        retrain = criteria_mode != CriteriaMode.WALK_FORWARD or (idx - 1) % BacktestConfig.WALK_FORWARD_RETRAIN_DAYS == 0
+        if retrain:
+            if use_criteria_stream:
+                volume_ratio_df = volume_ratio_stream.advance(end_date).criteria_df()
+                strength_df = strength_stream.advance(end_date).criteria_df()
+            else:
+                volume_ratio_df = set_criteria_df(BacktestConfig.VOLUME_RATIO_PATH_TEMPLATE.format(window=BacktestConfig.VOLUME_WINDOW_SIZE), start_date, end_date)
+                strength_df = set_criteria_df(BacktestConfig.STRENGTH_DATA_PATH, start_date, end_date)
+            criteria_df = pd.merge(
+                volume_ratio_df, strength_df,
+                on="시간", suffixes=('_volume', '_strength')
+            )
+            criteria_df['시간'] = pd.to_datetime(criteria_df['시간'], format='%H:%M:%S').dt.time
+
+        # 전 종목 분 단위 데이터 1회 로드 후 매수/후보 시그널을 (종목 x 분) 배열에서 일괄 평가
+        stock_frames = load_day_signal_frames(stock_codes, current_test_date, volume_data_df, BacktestConfig.VOLUME_WINDOW_SIZE)
+        day_entries = scan_day_signals(day_signals, stock_frames, criteria_df)
+
+        result_watchlist = build_buy_watchlist(day_entries.pop(BUY_SIGNAL_NAME), BacktestConfig.BUY_PRICE_PER_CODE)
+        for info in result_watchlist:
+            balance -= info['보유수량'] * info['현재가']
+
+        for name, entries in day_entries.items():
+            candidate_entry_nums[name] += len(entries)
+        logger.info("후보 시그널 진입 종목수: " + ", ".join(f"{name}={len(entries)}" for name, entries in day_entries.items()))
+
+        # 매도 처리
+        trade_result = {}
+        date_path = f"{BacktestConfig.TIMESERIES_DATA_PATH}/{current_test_date.strftime('%Y%m%d')}"
+        if horizon_exit:
+            data_frames = {info['종목코드']: load_stock_file_cached(info['종목코드'], date_path) for info in result_watchlist}
+            minute_price_df = build_minute_price_matrix({code: df for code, df in data_frames.items() if df is not None})
+            exits_df = execute_horizon_exits(
+                BacktestConfig.SELL_STRATEGY,
+                result_watchlist, close_price_df, minute_price_df, current_test_date,
+                test_date_lst[-1], BacktestConfig.TRANSACTION_COST
+            )
+            trade_result = dict(zip(exits_df['종목코드'], exits_df['수익률']))
+            open_positions = exits_df if open_positions.empty else pd.concat([open_positions, exits_df], ignore_index=True)
+        else:
             for info in result_watchlist:
                 try:
-                    date_path = f"{BacktestConfig.TIMESERIES_DATA_PATH}/{current_test_date.strftime('%Y%m%d')}"
                     data_df = load_stock_file_cached(info['종목코드'], date_path)
 
                     if data_df is None:
@@ -105,16 +143,33 @@ def main(korea_invest_api, stock_codes):
                 except Exception as e:
                     logger.error(f"매도 처리 오류 ({info['종목코드']}): {e}")
 
-            total_trade_result[current_test_date.strftime('%Y%m%d')] = trade_result
-            total_stock_nums += len(result_watchlist)
-            balance_history.append(balance)
+        # 매도일 도래 포지션 청산, 미청산 포지션은 당일까지의 마지막 종가로 평가 (종가가 없으면 매수가)
+        holding_value = 0
+        if not open_positions.empty:
+            today = pd.Timestamp(current_test_date)
+            due = open_positions['매도일'] <= today
+            balance += open_positions.loc[due, '매도금액'].sum()
+            open_positions = open_positions[~due]
+
+            if not open_positions.empty:
+                known_close = close_price_df.loc[:today].reindex(columns=open_positions['종목코드']).ffill()
+                last_close = known_close.iloc[-1].to_numpy() if not known_close.empty else float('nan')
+                mark_price = pd.Series(last_close, index=open_positions.index).fillna(open_positions['매수가'])
+                holding_value = (open_positions['보유수량'] * mark_price).sum()
+                logger.info(f"보유 포지션: {len(open_positions)}개, 평가금액: {holding_value:,.0f}원")
+
+        total_trade_result[current_test_date.strftime('%Y%m%d')] = trade_result
+        total_stock_nums += len(result_watchlist)
+        balance_history.append(balance + holding_value)
 
-            logger.info(f"발견 종목수: {len(result_watchlist)}, 잔고: {balance:,.0f}원")
+        logger.info(f"발견 종목수: {len(result_watchlist)}, 잔고: {balance:,.0f}원")
 
     print(f"\n{'=' * 60}")
     print(f"매도 전략: {BacktestConfig.SELL_STRATEGY.name}")
     print(f"{'=' * 60}")
     print(f"일 평균 거래 종목수: {total_stock_nums / (len(test_date_lst) - 1):.2f}개")
+    for name, entry_nums in candidate_entry_nums.items():
+        print(f"후보 시그널 {name} 일 평균 진입 종목수: {entry_nums / (len(test_date_lst) - 1):.2f}개")
 
     # 성과 지표
     mdd = calculate_mdd(balance_history)
@@ -127,6 +182,7 @@ def main(korea_invest_api, stock_codes):
     print(f"Maximum Drawdown (MDD): {mdd:.2f}%")
     print(f"Sharpe Ratio: {sharpe_ratio:.2f}")
     print(f"Final Balance: {balance:,.0f}원")
+    print(f"Peak RSS: {get_peak_rss_mb():,.1f} MB")
     print(f"{'=' * 60}")
 
 
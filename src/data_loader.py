@@ -1,14 +1,18 @@
+from snapshot_schema import SnapshotRecord, today_midnight_epoch, write_snapshot_csv
 from utils import KoreaInvestEnv, KoreaInvestAPI
 from datetime import datetime, time
 from collections import defaultdict
 from loguru import logger
 import time as pytime
-import pandas as pd
 import threading
 import queue
 import yaml
 import os
 
+CHUNK_SIZE = 6  # 청크당 종목 수
+CHUNK_TIME = 1.44  # 청크 간격(초) 1.44 (20250916 테스트 일자) -> 잘 나옴
+TR_INTERVAL = CHUNK_TIME / (CHUNK_SIZE * 2)  # TR 1회당 간격 (청크 = 종목당 TR 2회 기준), 청크 대기는 실제 TR 수에 비례
+
 def wait_until_start(start_time):
     now = datetime.now()
     if now >= start_time:
@@ -31,6 +35,12 @@ def calculate_buy_sell_volumes(strength, total_volume):
 
     return total_buy, total_sell
 
+def calculate_remaining_ratio(total_ask, total_bid):
+    """잔량비율 (총매수잔량 / 총매도잔량 * 100)"""
+    if total_ask is None or total_bid is None:
+        return None
+    return round(total_bid / total_ask * 100, 2) if total_ask != 0 else total_bid
+
 def create_directory(base_path: str="./data"):
     folder_name = datetime.now().strftime('%Y%m%d')
     directory_path = os.path.join(base_path, folder_name)
@@ -42,29 +52,72 @@ def create_directory(base_path: str="./data"):
     return directory_path
 
 class KISDataLoader:
-    def __init__(self):
+    def __init__(self, korea_invest_api, on_record=None):
+        self.korea_invest_api = korea_invest_api
+        self.on_record = on_record  # 레코드 수신 시 호출 (실시간 시그널 로직 연결용)
         self.first_volume_dict = dict()
         self.data_queue = queue.Queue()  # 수신 데이터 보관
         self.stop_event = threading.Event()  # 스레드 종료 신호 관리
         self.first_time_check_data_collected = False # 첫번째 데이터 수집 여부 확인+
         self.collected_data = defaultdict(list)  # 수신한 데이터 전체 관리
+        self.multi_daily_trades = dict()  # 사이클 내 멀티종목 현재가 조회 결과
+        self.multi_hoga = dict()  # 사이클 내 멀티종목 호가 조회 결과
+        self.tr_count = 0  # 누적 TR 요청 수 (청크 간격 조정용)
 
     def _get_first_time_data(self, code):
+        self.tr_count += 1
         try:
-            return korea_invest_api.get_first_time_hoga_remaining_info(code)
+            return self.korea_invest_api.get_first_time_hoga_remaining_info(code)
         except Exception as e:
             logger.info(f"종목코드:{code}, 주식현재가 호가/예상체결 수집 실패: {e}")
             return None, None, None, None, None
 
+    def _clear_cycle_cache(self):
+        """사이클 시작 시 멀티종목 조회 결과 초기화"""
+        self.multi_daily_trades.clear()
+        self.multi_hoga.clear()
+
+    def _prefetch_chunk(self, code_chunk):
+        """멀티종목 조회 (API 가 지원하는 경우 청크당 TR 1회로 대체)"""
+        batch_requests = (
+            ("get_multi_daily_trades", self.multi_daily_trades),
+            ("get_multi_hoga_remaining_info", self.multi_hoga),
+        )
+        for method_name, cache in batch_requests:
+            fetch_multi = getattr(self.korea_invest_api, method_name, None)
+            if fetch_multi is None:
+                continue
+
+            missing_codes = [code for code in code_chunk if code not in cache]
+            if not missing_codes:
+                continue
+
+            self.tr_count += 1
+            try:
+                cache.update(fetch_multi(missing_codes))  # {종목코드: 단일종목 TR 과 동일한 튜플}
+            except Exception as e:
+                logger.info(f"멀티종목 조회 실패 ({method_name}): {e}")
+
+    def _is_prefetched(self, code):
+        return code in self.multi_daily_trades and code in self.multi_hoga
+
     def _get_regular_data(self, code):
         try:
-            rate_compared_prev_day, cumulative_volume, pr_price, strength = korea_invest_api.get_daily_trades(code)
+            if code in self.multi_daily_trades:
+                rate_compared_prev_day, cumulative_volume, pr_price, strength = self.multi_daily_trades.pop(code)
+            else:
+                self.tr_count += 1
+                rate_compared_prev_day, cumulative_volume, pr_price, strength = self.korea_invest_api.get_daily_trades(code)
         except Exception as e:
             logger.info(f"종목코드:{code}, 현재가 정보 수집 실패: {e}")
             rate_compared_prev_day, cumulative_volume, pr_price, strength = None, None, None, None
 
         try:
-            total_ask, total_bid, estimated_change = korea_invest_api.get_hoga_remaining_info(code)
+            if code in self.multi_hoga:
+                total_ask, total_bid, estimated_change = self.multi_hoga.pop(code)
+            else:
+                self.tr_count += 1
+                total_ask, total_bid, estimated_change = self.korea_invest_api.get_hoga_remaining_info(code)
         except Exception as e:
             logger.info(f"종목코드:{code}, 호가 정보 수집 실패: {e}")
             total_ask, total_bid, estimated_change = None, None, None
@@ -81,15 +134,68 @@ class KISDataLoader:
         """큐에서 데이터 수집"""
         try:
             data = self.data_queue.get(timeout=1)
-            code_num = data['종목코드']
-            self.collected_data[code_num].append(data)
-            return True
         except queue.Empty:
             pytime.sleep(0.1)
             return False
+
+        try:
+            self.collected_data[data.종목코드].append(data)
+            if self.on_record is not None:
+                self.on_record(data)
+            return True
         except Exception as e:
             logger.exception(f"조건 체크 중 예외 발생: {e}")
             return False
+        finally:
+            self.data_queue.task_done()
+
+    def run_consumer(self):
+        """큐 소비 루프 (stop_event 까지)"""
+        while not self.stop_event.is_set():
+            if not self._collect_queue_data():
+                continue
+
+    def collect_snapshot(self, code, tr_request_time):
+        """종목 1개 스냅샷 조회 -> SnapshotRecord (첫 사이클은 예상체결 TR 1회, 이후 TR 2회)"""
+        if not self.first_time_check_data_collected:  # 첫번재 데이터 수신
+            estimated_change, indicative_opening_price, indicative_opening_volume, total_ask, total_bid = self._get_first_time_data(code)  # TR 1회
+            self.first_volume_dict[code] = indicative_opening_volume
+
+            return SnapshotRecord(
+                tr_request_time, code,
+                estimated_change,  # 시초가
+                indicative_opening_price,  # 현재가
+                estimated_change,  # 전일대비
+                indicative_opening_volume if indicative_opening_volume is not None else 0,  # 누적거래량
+                0,  # 누적강도
+                0,  # 총매도량
+                0,  # 총매수량
+                total_ask, total_bid,
+                calculate_remaining_ratio(total_ask, total_bid),
+            )
+
+        # 두번째~ 데이터 수신
+        rate_compared_prev_day, cumulative_volume, pr_price, strength, total_ask, total_bid, estimated_change = self._get_regular_data(code)  # TR 2회
+
+        # 총매수량, 총매도량 계산
+        first_volume = self.first_volume_dict.get(code)
+        if first_volume is not None and strength is not None and cumulative_volume is not None:
+            cumulative_buy_volume, cumulative_sell_volume = calculate_buy_sell_volumes(strength, cumulative_volume - first_volume)
+        else:
+            cumulative_buy_volume, cumulative_sell_volume = None, None
+
+        return SnapshotRecord(
+            tr_request_time, code,
+            estimated_change,  # 시초가
+            pr_price,  # 현재가
+            rate_compared_prev_day,  # 전일대비
+            cumulative_volume,  # 누적거래량
+            strength,  # 누적강도
+            cumulative_sell_volume,  # 총매도량
+            cumulative_buy_volume,  # 총매수량
+            total_ask, total_bid,
+            calculate_remaining_ratio(total_ask, total_bid),
+        )
 
     def is_program_endtime(self, end_time):
         if datetime.now() > end_time:
@@ -103,95 +209,54 @@ class KISDataLoader:
             if not data_list:
                 continue
             file_path = os.path.join(folder_path, f"{stock_code}_{today_date}.csv")
-            df = pd.DataFrame(data_list)
-
-            df['종목코드'] = 'A' + df['종목코드'].astype(str)
-            save_to_cols = ['시간', '종목코드', '시초가', '현재가', '전일대비', '누적거래량', '누적강도', '총매도량', '총매수량', '총매도잔량', '총매수잔량', '잔량비율',]
-            df[save_to_cols].to_csv(file_path, index=False, encoding='utf-8-sig')
+            write_snapshot_csv(data_list, file_path)
             logger.info(f"종목코드 {stock_code} 저장 완료!")
 
+    def collect_cycle(self, stock_codes, request_time, throttle=True):
+        """1 사이클 수집: 청크별 멀티종목 조회 -> 종목별 스냅샷 -> 큐 적재
+        request_time(code): 레코드 시간(자정 기준 경과 초), throttle: TR 간격 조정 여부"""
+        self._clear_cycle_cache()
+
+        for i in range(0, len(stock_codes), CHUNK_SIZE):
+            code_chunk = stock_codes[i:i + CHUNK_SIZE]
+            chunk_start_time = pytime.perf_counter()
+            chunk_start_tr = self.tr_count
+            if self.first_time_check_data_collected:
+                self._prefetch_chunk(code_chunk)
+
+            for code in code_chunk:
+                tr_required = not (self.first_time_check_data_collected and self._is_prefetched(code))
+                record = self.collect_snapshot(code, request_time(code))
+                self.data_queue.put(record)
+                if throttle and tr_required:
+                    pytime.sleep(0.05)
+
+            # 청크 간격 조정: 실제 요청한 TR 수만큼 대기 (12TR/1.44sec, 멀티종목 조회 시 2TR -> 0.24sec)
+            if throttle:
+                self._wait_for_remaining_time(chunk_start_time, TR_INTERVAL * (self.tr_count - chunk_start_tr))
+
+        if not self.first_time_check_data_collected:
+            self.first_time_check_data_collected = True
+
     def fetch_30s_snapshot(self, stock_codes, data_save_path, program_end_time):
         def collect_data():
-            chunk_size = 6
-            chunk_time = 1.44  # 1.44 (20250916 테스트 일자) -> 잘 나옴
+            midnight_epoch = today_midnight_epoch()  # 시간 = 자정 기준 경과 초
             while not self.stop_event.is_set():
                 cycle_start_time = pytime.perf_counter()
                 logger.info(f"{len(stock_codes)} 종목 데이터 수신 시작")
 
-                for i in range(0, len(stock_codes), chunk_size):
-                    code_chunk = stock_codes[i:i + chunk_size]
-                    chunk_start_time = pytime.perf_counter()
-
-                    for code in code_chunk:
-                        tr_request_time = datetime.now().strftime("%H:%M:%S")
-
-                        if not self.first_time_check_data_collected:  # 첫번재 데이터 수신
-                            estimated_change, indicative_opening_price, indicative_opening_volume, total_ask, total_bid = self._get_first_time_data(code)  # TR 1회
-
-                            stock_data_dict = {
-                                "시간": tr_request_time,
-                                "종목코드": code,
-                                "시초가": estimated_change,
-                                "현재가": indicative_opening_price,
-                                "전일대비": estimated_change,
-                                "총매도량": 0,
-                                "총매수량": 0,
-                                "총매도잔량": total_ask,
-                                "총매수잔량": total_bid,
-                                "잔량비율": round(total_bid / total_ask * 100, 2) if total_ask != 0 else total_bid,
-                                "누적거래량": indicative_opening_volume if indicative_opening_volume is not None else 0,
-                                "누적강도": 0,
-                            }
-                            self.first_volume_dict[code] = indicative_opening_volume
-                        else:
-                            # 두번째~ 데이터 수신
-                            rate_compared_prev_day, cumulative_volume, pr_price, strength, total_ask, total_bid, estimated_change = self._get_regular_data(code)  # TR 2회
-
-                            # 총매수량, 총매도량 계산
-                            first_volume = self.first_volume_dict.get(code)
-                            if first_volume is not None and strength is not None and cumulative_volume is not None:
-                                cumulative_buy_volume, cumulative_sell_volume = calculate_buy_sell_volumes(strength, cumulative_volume - first_volume)
-                            else:
-                                cumulative_buy_volume, cumulative_sell_volume = None, None
-
-                            stock_data_dict = {
-                                "시간": tr_request_time,
-                                "종목코드": code,
-                                "시초가": estimated_change,
-                                "현재가": pr_price,
-                                "전일대비": rate_compared_prev_day,
-                                "총매도량": cumulative_sell_volume,
-                                "총매수량": cumulative_buy_volume,
-                                "총매도잔량": total_ask,
-                                "총매수잔량": total_bid,
-                                "잔량비율": round(total_bid / total_ask * 100, 2) if total_ask != 0 else total_bid,
-                                "누적거래량": cumulative_volume,
-                                "누적강도": strength
-                            }
-                        self.data_queue.put(stock_data_dict)
-                        pytime.sleep(0.05)
-
-                    # 청크 간격 조정 (18TR/1.44sec)
-                    self._wait_for_remaining_time(chunk_start_time, chunk_time)
+                self.collect_cycle(stock_codes, lambda code: int(pytime.time() - midnight_epoch))
 
                 logger.info(f"{len(stock_codes)} 종목 데이터 수신 완료")
 
-                if not self.first_time_check_data_collected:
-                    self.first_time_check_data_collected = True
-
                 # 종목당 텀 관리 (30sec)
                 self._wait_for_remaining_time(cycle_start_time, 30)
 
             logger.info(f"Thread 1 (collect_data) 활성시간이 종료되었습니다.")
 
-        def set_data():
-            while not self.stop_event.is_set():
-                if not self._collect_queue_data():
-                    continue
-
         threads = [
             threading.Thread(target=collect_data, daemon=True),
-            threading.Thread(target=set_data, daemon=True),
+            threading.Thread(target=self.run_consumer, daemon=True),
         ]
 
         for t in threads:
@@ -225,7 +290,7 @@ if __name__ == "__main__":
     stock_codes = [] # 종목코드 리스트업
 
     data_save_path = create_directory(base_path='./data')
-    stream_processor = KISDataLoader()
+    stream_processor = KISDataLoader(korea_invest_api)
     wait_until_start(program_start_time)  # 프로그램 실행 시작 시간까지 대기
 
     stream_processor.fetch_30s_snapshot(stock_codes, data_save_path, program_end_time)
\ No newline at end of file
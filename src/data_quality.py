@@ -0,0 +1,138 @@
+from snapshot_schema import read_snapshot_csv, time_str_to_seconds, format_int_columns
+from pathlib import Path
+from loguru import logger
+from enum import Enum
+import pandas as pd
+import numpy as np
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # 프로젝트 루트 (config)
+from config.backtest_config import BacktestConfig
+
+# 수집기는 30초 사이클마다 종목별로 1행씩 기록 (TR 실패 시에도 빈 값으로 기록)
+STALE_MAX_CYCLES = 10  # 현재가/누적거래량이 10사이클(5분) 이상 그대로면 정체로 판단
+
+GAP_COLUMNS = ['현재가', '누적거래량', '누적강도', '총매도량', '총매수량']
+FILL_COLUMNS = GAP_COLUMNS + ['총매도잔량', '총매수잔량', '잔량비율']
+REPORT_FILE_NAME = '_quality_report.csv'
+
+
+class RepairPolicy(Enum):
+    """이상치 처리 정책"""
+    NONE = 1  # 리포트만 작성
+    FFILL = 2  # 결측은 직전 값, 누적거래량 역행은 직전 최대값으로 보정
+    MASK = 3  # 누적거래량 역행, 정체 구간을 NaN 으로 마스킹
+
+
+def load_day_snapshots(day_dir) -> pd.DataFrame:
+    """하루치 스냅샷 CSV 를 하나의 DataFrame 으로 로드 (파일명, 경과초 컬럼 추가)"""
+    frames = []
+    for file_path in sorted(Path(day_dir).glob('*.csv')):
+        if file_path.name.startswith('_'):  # 리포트 등 스냅샷 외 파일
+            continue
+        df = read_snapshot_csv(file_path)
+        df['파일명'] = file_path.name
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame()
+
+    day_df = pd.concat(frames, ignore_index=True)
+    time_col = '현재시간' if '현재시간' in day_df.columns else '시간'
+    day_df['경과초'] = time_str_to_seconds(day_df[time_col])
+    return day_df.sort_values(['파일명', '경과초'], kind='stable', ignore_index=True)
+
+
+def validate_day_snapshots(day_df: pd.DataFrame, policy: RepairPolicy = RepairPolicy.FFILL) -> tuple:
+    """하루치 스냅샷 검증 (종목 전체 벡터화) -> (보정 DataFrame, 종목별 리포트)"""
+    file_key = day_df['파일명']
+    new_file = file_key != file_key.shift()
+
+    # 누락 사이클: 종목별 행 수를 당일 최대 행 수(= 수집 사이클 수)와 비교
+    # (사이클 내 수집 시각은 종목마다 밀리므로 시각 대신 행 위치 기준)
+    rows_per_file = file_key.value_counts()
+
+    # 누적거래량 역행: 종목 내 직전까지의 최대값보다 작은 값 (사이 결측이 있어도 검출)
+    volume = day_df['누적거래량']
+    running_max = volume.groupby(file_key).cummax().groupby(file_key).ffill()
+    non_monotonic = volume < running_max.groupby(file_key).shift()
+
+    # 정체: 현재가와 누적거래량이 모두 그대로인 연속 구간
+    price = day_df['현재가']
+    changed = new_file | (price != price.shift()) | (volume != volume.shift()) | price.isna()
+    run_id = changed.cumsum()
+    run_length = run_id.map(run_id.value_counts())
+    stale = (run_length >= STALE_MAX_CYCLES) & ~changed
+
+    report_df = pd.DataFrame({
+        '종목코드': day_df.groupby(file_key)['종목코드'].first(),
+        '행수': rows_per_file,
+        '누락사이클': rows_per_file.max() - rows_per_file,
+        '누적거래량_역행': non_monotonic.groupby(file_key).sum(),
+        '최대정체사이클': run_length.groupby(file_key).max(),
+    })
+    missing_df = day_df[GAP_COLUMNS].isna().groupby(file_key).sum().add_suffix('_결측')
+    report_df = report_df.join(missing_df)
+
+    issue_cols = ['누락사이클', '누적거래량_역행'] + list(missing_df.columns)
+    report_df['정상'] = (report_df[issue_cols] == 0).all(axis=1) & (report_df['최대정체사이클'] < STALE_MAX_CYCLES)
+    report_df.index.name = '파일명'
+
+    # 보정
+    repaired_df = day_df.copy()
+    fill_cols = [col for col in FILL_COLUMNS if col in repaired_df.columns]
+    if policy == RepairPolicy.FFILL:
+        repaired_df['누적거래량'] = repaired_df.groupby(file_key)['누적거래량'].cummax()
+        repaired_df[fill_cols] = repaired_df.groupby(file_key)[fill_cols].ffill()
+    elif policy == RepairPolicy.MASK:
+        repaired_df.loc[non_monotonic, '누적거래량'] = np.nan
+        repaired_df.loc[stale, ['현재가', '누적거래량']] = np.nan
+
+    return repaired_df, report_df
+
+
+def save_day_snapshots(repaired_df: pd.DataFrame, report_df: pd.DataFrame, output_dir) -> None:
+    """보정된 스냅샷(원본 파일명 유지)과 품질 리포트 저장"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    for file_name, df in repaired_df.groupby('파일명', sort=False):
+        format_int_columns(df.drop(columns=['파일명', '경과초'])).to_csv(output_dir / file_name, index=False, encoding='utf-8-sig')
+
+    report_df.to_csv(output_dir / REPORT_FILE_NAME, encoding='utf-8-sig')
+
+
+def load_flagged_codes(day_dir) -> set:
+    """품질 리포트에서 정상이 아닌 종목코드 (리포트가 없으면 빈 집합)"""
+    report_path = Path(day_dir) / REPORT_FILE_NAME
+    if not report_path.exists():
+        return set()
+
+    report_df = pd.read_csv(report_path, encoding='utf-8-sig')
+    flagged_files = report_df.loc[~report_df['정상'].astype(bool), '파일명']
+    return {Path(file_name).stem.split('_')[0] for file_name in flagged_files}
+
+
+def validate_archive(data_path, output_path, policy: RepairPolicy = RepairPolicy.FFILL) -> pd.DataFrame:
+    """전체 아카이브(일자 폴더) 검증 및 보정 -> 일자별 요약"""
+    day_dirs = sorted(d for d in Path(data_path).iterdir() if d.is_dir() and d.name.isdigit() and len(d.name) == 8)
+
+    summary = []
+    for day_dir in day_dirs:
+        day_df = load_day_snapshots(day_dir)
+        if day_df.empty:
+            continue
+
+        repaired_df, report_df = validate_day_snapshots(day_df, policy)
+        save_day_snapshots(repaired_df, report_df, Path(output_path) / day_dir.name)
+
+        n_bad = int((~report_df['정상']).sum())
+        summary.append({'일자': day_dir.name, '종목수': len(report_df), '이상종목수': n_bad})
+        logger.info(f"{day_dir.name} 검증 완료 - 종목: {len(report_df)}개, 이상 종목: {n_bad}개")
+
+    return pd.DataFrame(summary)
+
+
+if __name__ == "__main__":
+    # 원본 -> 보정본 (BacktestConfig.USE_CLEAN_DATA 이면 src/indicators, 백테스트가 보정본 사용)
+    validate_archive(BacktestConfig.RAW_TIMESERIES_DATA_PATH, BacktestConfig.CLEAN_TIMESERIES_DATA_PATH, RepairPolicy.FFILL)
@@ -1,4 +1,6 @@
 from utils import KoreaInvestEnv, KoreaInvestAPI
+from data_quality import load_flagged_codes
+from snapshot_schema import read_snapshot_csv
 import FinanceDataReader as fdr
 from datetime import timedelta
 from typing import List, Dict
@@ -7,6 +9,10 @@ from loguru import logger
 import time as pytime
 import pandas as pd
 import yaml
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # 프로젝트 루트 (config)
+from config.backtest_config import BacktestConfig
 
 def get_market_open_days(start_date: str, end_date: str, include_prev: bool = False) -> pd.DatetimeIndex:
     """개장일 리스트업"""
@@ -77,7 +83,7 @@ def process_single_stock(code_info: Dict, data_path: Path, volume_data: pd.DataF
 
     try:
         file_path = data_path / td.strftime('%Y%m%d') / f"{code}.csv"
-        df = pd.read_csv(file_path)
+        df = read_snapshot_csv(file_path)
         df = process_time_column(df)
 
         # 평균 거래량 계산
@@ -147,7 +153,7 @@ def main():
 
     # 데이터 로드
     volume_data = pd.read_pickle("../data/daily_volume_data.pkl")
-    data_path = Path("../data")
+    data_path = Path(BacktestConfig.TIMESERIES_DATA_PATH)
     window = 20
     stock_codes = []  # 종목코드 리스트업
 
@@ -175,6 +181,13 @@ def main():
             filtered_stocks = get_top_increase_rate(korea_invest_api, td, stock_codes, prev_day)
             all_filtered_stocks.extend(filtered_stocks)
 
+    # 품질 리포트상 이상 종목은 기준 산출에서 제외 (src/data_quality)
+    if BacktestConfig.SKIP_FLAGGED_CODES:
+        flagged_codes = {td: load_flagged_codes(data_path / td.strftime('%Y%m%d')) for td in trading_date_list}
+        n_before = len(all_filtered_stocks)
+        all_filtered_stocks = [info for info in all_filtered_stocks if info['종목코드'] not in flagged_codes[info['일자']]]
+        logger.info(f"품질 이상 종목 제외: {n_before - len(all_filtered_stocks)}건")
+
     # 병렬 처리로 종목 데이터 처리
     volume_dfs = []
     strength_dfs = []
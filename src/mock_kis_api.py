@@ -0,0 +1,93 @@
+from data_loader import KISDataLoader, CHUNK_SIZE
+from loguru import logger
+import time as pytime
+import threading
+import zlib
+
+MULTI_QUOTE_MAX_CODES = 30  # KIS 관심종목(멀티종목) 시세 조회 1회 최대 종목 수
+
+
+class MockKoreaInvestAPI:
+    """KoreaInvestAPI 대체 객체 - 합성 시세 응답, 왕복(round-trip) 횟수 집계, 왕복당 지연 시뮬레이션
+    시세는 (종목코드, cycle) 로 결정되므로 조회 방식과 무관하게 같은 값을 반환"""
+    def __init__(self, latency_sec=0.0):
+        self.latency_sec = latency_sec
+        self.cycle = 0
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def _round_trip(self):
+        with self._lock:
+            self.round_trips += 1
+        if self.latency_sec > 0:
+            pytime.sleep(self.latency_sec)
+
+    def _quote(self, code):
+        """(전일대비, 누적거래량, 현재가, 체결강도, 총매도잔량, 총매수잔량, 예상체결대비)"""
+        base = zlib.crc32(code.encode()) % 90_000 + 10_000
+        price = base + 10 * self.cycle
+        rate = round((price - base) / base * 100 + 5, 2)
+        return rate, 1_000 * (self.cycle + 1), price, 100 + self.cycle % 50, 5_000, 6_000, rate
+
+    def get_first_time_hoga_remaining_info(self, code):
+        self._round_trip()
+        rate, volume, price, _, total_ask, total_bid, _ = self._quote(code)
+        return rate, price, volume, total_ask, total_bid
+
+    def get_daily_trades(self, code):
+        self._round_trip()
+        return self._quote(code)[:4]
+
+    def get_hoga_remaining_info(self, code):
+        self._round_trip()
+        return self._quote(code)[4:]
+
+
+class MockMultiQuoteKoreaInvestAPI(MockKoreaInvestAPI):
+    """멀티종목 조회(get_multi_*)를 제공하는 KoreaInvestAPI 대체 객체"""
+    def _check_codes(self, codes):
+        if len(codes) > MULTI_QUOTE_MAX_CODES:
+            raise ValueError(f"멀티종목 조회는 최대 {MULTI_QUOTE_MAX_CODES}종목까지 가능합니다. (요청: {len(codes)})")
+
+    def get_multi_daily_trades(self, codes):
+        self._check_codes(codes)
+        self._round_trip()
+        return {code: self._quote(code)[:4] for code in codes}
+
+    def get_multi_hoga_remaining_info(self, codes):
+        self._check_codes(codes)
+        self._round_trip()
+        return {code: self._quote(code)[4:] for code in codes}
+
+
+def measure_cycles(api, stock_codes, n_cycles=3, throttle=True):
+    """KISDataLoader.collect_cycle 을 n_cycles 회 실행 -> 사이클별 왕복 횟수/소요시간 및 수집 레코드
+    throttle: 실시간 수집과 동일한 TR 간격 조정 적용 여부"""
+    loader = KISDataLoader(api)
+    consumer = threading.Thread(target=loader.run_consumer, daemon=True)
+    consumer.start()
+
+    results = []
+    for cycle in range(n_cycles):
+        api.cycle = cycle
+        api.round_trips = 0
+        start = pytime.perf_counter()
+        loader.collect_cycle(stock_codes, lambda code: 9 * 3600 + 30 * (cycle + 1), throttle=throttle)
+        results.append({'cycle': cycle, 'round_trips': api.round_trips, 'elapsed_sec': pytime.perf_counter() - start})
+
+    loader.data_queue.join()
+    loader.stop_event.set()
+    consumer.join()
+    return results, loader.collected_data
+
+
+if __name__ == "__main__":
+    stock_codes = [f"{i:06d}" for i in range(60)]
+    latency_sec = 0.02  # 왕복당 지연
+
+    for api in (MockKoreaInvestAPI(latency_sec), MockMultiQuoteKoreaInvestAPI(latency_sec)):
+        results, _ = measure_cycles(api, stock_codes, n_cycles=2)
+        for result in results:
+            logger.info(f"{type(api).__name__} - 사이클 {result['cycle']}: "
+                        f"왕복 {result['round_trips']}회 (종목당 {result['round_trips'] / len(stock_codes):.2f}회), "
+                        f"소요시간 {result['elapsed_sec']:.2f}초 (청크 {CHUNK_SIZE}종목, TR 간격 조정 포함)")
@@ -0,0 +1,167 @@
+from snapshot_schema import read_snapshot_csv, records_to_frame, time_str_to_seconds
+from collections import defaultdict, deque
+from data_loader import KISDataLoader
+from typing import Dict, Optional
+from pathlib import Path
+from loguru import logger
+import time as pytime
+import pandas as pd
+import numpy as np
+import threading
+
+def load_recorded_day(day_dir) -> Dict[str, pd.DataFrame]:
+    """하루치 스냅샷 CSV 로드 {종목코드: DataFrame (시간 = 자정 기준 경과 초)}"""
+    recorded = {}
+    for file_path in sorted(Path(day_dir).glob('*.csv')):
+        if file_path.name.startswith('_'):  # 리포트 등 스냅샷 외 파일
+            continue
+        df = read_snapshot_csv(file_path)
+        time_col = '현재시간' if '현재시간' in df.columns else '시간'
+        df['시간'] = time_str_to_seconds(df[time_col])
+        code = str(df['종목코드'].iloc[0]).removeprefix('A')
+        recorded[code] = df
+    return recorded
+
+# 응답 그대로의 컬럼 + 수집기가 계산하는 파생 컬럼 (총매도량, 총매수량, 잔량비율)
+VERIFY_COLUMNS = ['시간', '시초가', '현재가', '전일대비', '누적거래량', '누적강도',
+                  '총매도량', '총매수량', '총매도잔량', '총매수잔량', '잔량비율']
+
+def verify_replay(recorded: Dict[str, pd.DataFrame], collected_data) -> pd.DataFrame:
+    """재생으로 수집된 레코드와 기록 행 비교 -> 불일치 목록 (종목코드, 사이클, 컬럼)"""
+    mismatches = []
+    for code, recorded_df in recorded.items():
+        replayed_df = records_to_frame(collected_data.get(code, []))
+        n_rows = min(len(recorded_df), len(replayed_df))
+        if len(recorded_df) != len(replayed_df):
+            mismatches.append({'종목코드': code, '사이클': n_rows, '컬럼': '행수'})
+
+        for col in VERIFY_COLUMNS:
+            expected = recorded_df[col].to_numpy(dtype=np.float64)[:n_rows]
+            actual = replayed_df[col].to_numpy(dtype=np.float64)[:n_rows]
+            differs = ~((expected == actual) | (np.isnan(expected) & np.isnan(actual)))
+            mismatches.extend({'종목코드': code, '사이클': int(cycle), '컬럼': col} for cycle in np.flatnonzero(differs))
+
+    return pd.DataFrame(mismatches, columns=['종목코드', '사이클', '컬럼'])
+
+def _to_value(value):
+    """NaN -> None (TR 실패와 동일하게 처리)"""
+    return None if pd.isna(value) else value
+
+
+class ReplayKoreaInvestAPI:
+    """기록된 스냅샷 행을 응답으로 돌려주는 KoreaInvestAPI 대체 객체"""
+    def __init__(self):
+        self.current_rows = {}  # 종목코드별 현재 사이클 재생 행
+
+    def set_cycle_rows(self, rows):
+        self.current_rows = rows
+
+    def get_first_time_hoga_remaining_info(self, code):
+        row = self.current_rows[code]
+        return (_to_value(row.전일대비), _to_value(row.현재가), _to_value(row.누적거래량),
+                _to_value(row.총매도잔량), _to_value(row.총매수잔량))
+
+    def get_daily_trades(self, code):
+        row = self.current_rows[code]
+        return _to_value(row.전일대비), _to_value(row.누적거래량), _to_value(row.현재가), _to_value(row.누적강도)
+
+    def get_hoga_remaining_info(self, code):
+        row = self.current_rows[code]
+        return _to_value(row.총매도잔량), _to_value(row.총매수잔량), _to_value(row.시초가)
+
+    def get_multi_daily_trades(self, codes):
+        return {code: self.get_daily_trades(code) for code in codes}
+
+    def get_multi_hoga_remaining_info(self, codes):
+        return {code: self.get_hoga_remaining_info(code) for code in codes}
+
+
+class SnapshotReplayer:
+    """기록된 30초 스냅샷을 KISDataLoader 의 수집 -> 큐 -> 소비 경로로 재생
+    speed: 재생 배속 (1.0 = 실시간, None = 최대 속도)"""
+    def __init__(self, recorded: Dict[str, pd.DataFrame], speed: Optional[float] = None, on_record=None):
+        self.recorded = recorded
+        self.speed = speed
+        self.on_record = on_record  # 실시간 시그널 로직
+        self.loader = None
+
+    def _build_events(self) -> pd.DataFrame:
+        """(사이클, 시간) 순으로 정렬한 재생 이벤트"""
+        frames = []
+        for code, df in self.recorded.items():
+            df = df.copy()
+            df['종목코드'] = code
+            df['사이클'] = np.arange(len(df))
+            frames.append(df)
+        events = pd.concat(frames, ignore_index=True)
+        return events.sort_values(['사이클', '시간'], kind='stable')
+
+    def run(self) -> dict:
+        """재생 실행 후 처리량/지연 시간 리포트 반환"""
+        api = ReplayKoreaInvestAPI()
+        emit_times = defaultdict(deque)  # 종목코드별 큐 적재 시각 (FIFO)
+        latencies = []
+
+        def on_record(record):
+            latencies.append(pytime.perf_counter() - emit_times[record.종목코드].popleft())
+            if self.on_record is not None:
+                self.on_record(record)
+
+        self.loader = KISDataLoader(api, on_record=on_record)
+        consumer = threading.Thread(target=self.loader.run_consumer, daemon=True)
+        consumer.start()
+
+        events = self._build_events()
+        if events.empty:
+            self.loader.stop_event.set()
+            consumer.join()
+            return {'records': 0}
+
+        first_time = events['시간'].iloc[0]
+        replay_start = pytime.perf_counter()
+        for _, cycle_events in events.groupby('사이클', sort=True):
+            if self.speed is not None:
+                wait = replay_start + (cycle_events['시간'].iloc[0] - first_time) / self.speed - pytime.perf_counter()
+                if wait > 0:
+                    pytime.sleep(wait)
+
+            rows = {row.종목코드: row for row in cycle_events.itertuples(index=False, name='RecordedRow')}
+            api.set_cycle_rows(rows)
+
+            def request_time(code):
+                emit_times[code].append(pytime.perf_counter())
+                return int(rows[code].시간)
+
+            # 실시간 수집과 동일한 사이클 처리 (TR 간격 조정만 생략)
+            self.loader.collect_cycle(list(rows), request_time, throttle=False)
+
+        self.loader.data_queue.join()
+        elapsed = pytime.perf_counter() - replay_start
+        self.loader.stop_event.set()
+        consumer.join()
+
+        mismatches = verify_replay(self.recorded, self.loader.collected_data)
+        if not mismatches.empty:
+            logger.warning(f"재생 레코드 불일치: {len(mismatches)}건\n{mismatches.head(10)}")
+
+        latencies_ms = np.array(latencies) * 1000
+        return {
+            'records': len(latencies),
+            'elapsed_sec': elapsed,
+            'records_per_sec': len(latencies) / elapsed if elapsed > 0 else float('inf'),
+            'latency_p50_ms': float(np.percentile(latencies_ms, 50)),
+            'latency_p99_ms': float(np.percentile(latencies_ms, 99)),
+            'latency_max_ms': float(latencies_ms.max()),
+            'mismatches': len(mismatches),
+        }
+
+
+if __name__ == "__main__":
+    recorded = load_recorded_day("../data/20250916")
+    replayer = SnapshotReplayer(recorded, speed=None)  # None: 최대 속도, 1.0: 실시간
+    report = replayer.run()
+
+    logger.info(f"재생 레코드: {report['records']}건, 불일치: {report.get('mismatches', 0)}건, 소요시간: {report.get('elapsed_sec', 0):.2f}초")
+    if report['records']:
+        logger.info(f"처리량: {report['records_per_sec']:,.0f}건/초, "
+                    f"지연(p50/p99/max): {report['latency_p50_ms']:.3f} / {report['latency_p99_ms']:.3f} / {report['latency_max_ms']:.3f} ms")
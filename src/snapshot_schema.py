@@ -0,0 +1,87 @@
+from typing import NamedTuple, Optional
+import time as pytime
+import pandas as pd
+import numpy as np
+
+class SnapshotRecord(NamedTuple):
+    """30초 스냅샷 레코드 (수집기 -> 큐 -> 저장 공통 스키마)"""
+    시간: int  # 자정 기준 경과 초
+    종목코드: str
+    시초가: Optional[float]
+    현재가: Optional[float]
+    전일대비: Optional[float]
+    누적거래량: Optional[float]
+    누적강도: Optional[float]
+    총매도량: Optional[float]
+    총매수량: Optional[float]
+    총매도잔량: Optional[float]
+    총매수잔량: Optional[float]
+    잔량비율: Optional[float]
+
+SNAPSHOT_COLUMNS = list(SnapshotRecord._fields)
+
+# 메모리(수집 중) 컬럼 타입: 결측(None)은 NaN 으로 저장되므로 수치 컬럼은 float64
+SNAPSHOT_DTYPES = {
+    '시간': np.int32,
+    '종목코드': object,
+    '시초가': np.float64,
+    '현재가': np.float64,
+    '전일대비': np.float64,
+    '누적거래량': np.float64,
+    '누적강도': np.float64,
+    '총매도량': np.float64,
+    '총매수량': np.float64,
+    '총매도잔량': np.float64,
+    '총매수잔량': np.float64,
+    '잔량비율': np.float64,
+}
+
+# CSV 파일 컬럼 타입: 시간은 'HH:MM:SS' 문자열로 저장 (기존 파일 호환)
+SNAPSHOT_CSV_DTYPES = {**SNAPSHOT_DTYPES, '시간': str}
+
+# CSV 에 정수로 기록하는 컬럼 (API 정수 응답: 가격/거래량/잔량, 결측은 빈 칸) - 기존 수집기 파일 형식 유지
+SNAPSHOT_INT_COLUMNS = ('현재가', '누적거래량', '총매도잔량', '총매수잔량')
+
+
+def today_midnight_epoch() -> float:
+    """오늘 자정의 epoch 초 (수집 시작 시 1회 계산)"""
+    now = pytime.localtime()
+    return pytime.mktime((now.tm_year, now.tm_mon, now.tm_mday, 0, 0, 0, 0, 0, -1))
+
+
+def seconds_to_time_str(seconds) -> pd.Series:
+    """자정 기준 경과 초 -> 'HH:MM:SS' 문자열 (벡터화)"""
+    return pd.to_datetime(pd.Series(seconds, dtype=np.int64), unit='s').dt.strftime('%H:%M:%S')
+
+
+def time_str_to_seconds(time_str) -> np.ndarray:
+    """'HH:MM:SS' 문자열 -> 자정 기준 경과 초 (벡터화)"""
+    parts = pd.Series(time_str, dtype=str).str.split(':', expand=True).astype(np.int32)
+    return (parts[0] * 3600 + parts[1] * 60 + parts[2]).to_numpy(dtype=np.int32)
+
+
+def records_to_frame(records) -> pd.DataFrame:
+    """SnapshotRecord 리스트 -> 스키마 타입이 적용된 DataFrame"""
+    df = pd.DataFrame.from_records(records, columns=SNAPSHOT_COLUMNS)
+    return df.astype(SNAPSHOT_DTYPES)
+
+
+def format_int_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """정수 컬럼(SNAPSHOT_INT_COLUMNS)을 nullable Int64 로 변환 (CSV 에 '60342.0' 대신 '60342')"""
+    for col in SNAPSHOT_INT_COLUMNS:
+        if col in df.columns and (df[col].dropna() % 1 == 0).all():
+            df[col] = df[col].astype('Int64')
+    return df
+
+
+def write_snapshot_csv(records, file_path: str) -> None:
+    """스냅샷 레코드를 CSV 로 저장 (종목코드 'A' 접두, 시간 'HH:MM:SS')"""
+    df = records_to_frame(records)
+    df['시간'] = seconds_to_time_str(df['시간']).to_numpy()
+    df['종목코드'] = 'A' + df['종목코드'].astype(str)
+    format_int_columns(df).to_csv(file_path, index=False, encoding='utf-8-sig')
+
+
+def read_snapshot_csv(file_path: str) -> pd.DataFrame:
+    """스냅샷 CSV 로드 (스키마 컬럼은 선언된 타입으로 파싱)"""
+    return pd.read_csv(file_path, dtype=SNAPSHOT_CSV_DTYPES, encoding='utf-8-sig')
@@ -1,9 +1,17 @@
+from strategies.signal_dsl import compile_signal, build_signal_arrays, first_signal_index, SNAPSHOT_FIELDS
+from src.snapshot_schema import read_snapshot_csv
 from config.backtest_config import BacktestConfig
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from loguru import logger
 import pandas as pd
+import numpy as np
 import os, glob
 
+BUY_SIGNAL_NAME = 'BUY_SIGNAL_EXPR'  # scan_day_signals 결과에서 매수 시그널 키
+BUY_SIGNAL = compile_signal(BacktestConfig.BUY_SIGNAL_EXPR)
+CANDIDATE_SIGNALS = {name: compile_signal(expr) for name, expr in BacktestConfig.CANDIDATE_SIGNAL_EXPRS.items()}
+
 @lru_cache(maxsize=BacktestConfig.CACHE_SIZE)
 def load_stock_file_cached(stock_code: str, directory_path: str):
     """파일 로딩 (캐싱 적용)"""
@@ -11,7 +19,7 @@ def load_stock_file_cached(stock_code: str, directory_path: str):
     file_path_1 = os.path.join(directory_path, f"{stock_code}.csv")
     if os.path.exists(file_path_1):
         try:
-            return pd.read_csv(file_path_1)
+            return read_snapshot_csv(file_path_1)
         except Exception as e:
             logger.warning(f"파일 로드 오류 ({file_path_1}): {e}")
 
@@ -21,7 +29,7 @@ def load_stock_file_cached(stock_code: str, directory_path: str):
 
     if file_list:
         try:
-            return pd.read_csv(file_list[0])
+            return read_snapshot_csv(file_list[0])
         except Exception as e:
             logger.warning(f"파일 로드 오류 ({file_list[0]}): {e}")
 
@@ -39,68 +47,87 @@ def process_minute_data(df: pd.DataFrame) -> pd.DataFrame:
 
     return result
 
-def process_single_stock(code, current_test_date, criteria_df, volume_data_df, volume_window_size, buy_price_by_code):
-    try:
-        # 데이터 로드
-        date_path = f"{BacktestConfig.TIMESERIES_DATA_PATH}/{current_test_date.strftime('%Y%m%d')}"
-        test_df = load_stock_file_cached(code, date_path)
-        if test_df is None:
-            return None
-        test_df = process_minute_data(test_df)
-
-        prev_volumes = volume_data_df[code].loc[:pd.to_datetime(current_test_date)].iloc[:-1].tail(volume_window_size)
-        average_mean_vol = prev_volumes.mean()
-
-        if average_mean_vol == 0:
-            return None
-
-        test_df['volume_ratio'] = test_df['누적거래량'] / average_mean_vol * 100
-
-        test_df['시간'] = pd.to_datetime(test_df['시간']).dt.time
-
-        final_df = pd.merge(
-            criteria_df,
-            test_df[['시간', 'volume_ratio', '누적강도', '현재가', '전일대비']],
-            on="시간"
-        )
-
-        time_limit_df = final_df[
-            final_df['시간'].between(
-                BacktestConfig.SIGNAL_TIME_START,
-                BacktestConfig.SIGNAL_TIME_END
-            )
-        ]
-
-        if time_limit_df.empty:
-            return None
-
-            # 매수 조건 확인
-            """누적체결강도 조건: 시간별 3분위수"""
-            # condition = (
-            #         (time_limit_df['q3_volume'] <= time_limit_df['volume_ratio']) &
-            #         (time_limit_df['q3_strength'] <= time_limit_df['누적강도']) &
-            #         (time_limit_df['전일대비'] > 0)
-            # )
-
-            q3_strength_q3 = criteria_df['q3_strength'].quantile(q=[0.5, 0.75]).loc[0.75]
-            """누적체결강도 조건: 전체 시간의 3분위수"""
-            condition = (time_limit_df['q3_volume'] <= time_limit_df[f'volume_ratio']) & \
-                        (q3_strength_q3 <= time_limit_df['누적강도']) & \
-                        (0 < time_limit_df['전일대비'])
-
-            if condition.any():
-                satisfying_row = time_limit_df[condition].iloc[0]
-                buy_nums = buy_price_by_code // satisfying_row['현재가']
-
-                return {
-                    '종목코드': code,
-                    '시간': satisfying_row['시간'],
-                    '현재가': satisfying_row['현재가'],
-                    '전일대비': satisfying_row['전일대비'],
-                    '보유수량': buy_nums
-                }
-
-    except Exception as e:
-        logger.warning(f"종목 {code} 처리 중 오류: {e}")
-
-    return None
\ No newline at end of file
+def load_signal_frame(code, current_test_date, volume_data_df, volume_window_size):
+    """종목 분 단위 시그널 입력 데이터 (volume_ratio 포함)"""
+    date_path = f"{BacktestConfig.TIMESERIES_DATA_PATH}/{current_test_date.strftime('%Y%m%d')}"
+    test_df = load_stock_file_cached(code, date_path)
+    if test_df is None:
+        return None
+    test_df = process_minute_data(test_df)
+
+    prev_volumes = volume_data_df[code].loc[:pd.to_datetime(current_test_date)].iloc[:-1].tail(volume_window_size)
+    average_mean_vol = prev_volumes.mean()
+
+    if average_mean_vol == 0:
+        return None
+
+    test_df['volume_ratio'] = test_df['누적거래량'] / average_mean_vol * 100
+    test_df['시간'] = pd.to_datetime(test_df['시간']).dt.time
+
+    return test_df
+
+def load_day_signal_frames(codes, current_test_date, volume_data_df, volume_window_size, max_workers=BacktestConfig.MAX_WORKERS):
+    """당일 전 종목 시그널 입력 데이터 {종목코드: DataFrame} (파일 로드는 멀티스레딩)"""
+    def load(code):
+        try:
+            return code, load_signal_frame(code, current_test_date, volume_data_df, volume_window_size)
+        except Exception as e:
+            logger.warning(f"종목 {code} 처리 중 오류: {e}")
+            return code, None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        frames = dict(executor.map(load, codes))
+
+    return {code: df for code, df in frames.items() if df is not None}
+
+def scan_day_signals(signals, stock_frames, criteria_df):
+    """여러 시그널을 (종목 x 분) 배열에서 한 번에 평가 -> {시그널명: 종목별 첫 진입 DataFrame}"""
+    entry_cols = ['종목코드', '시간', '현재가', '전일대비']
+
+    # 시그널/진입 정보에 필요한 스냅샷 컬럼이 없는 종목은 제외
+    required = {'현재가', '전일대비'}.union(*(signal.fields for signal in signals.values())) & set(SNAPSHOT_FIELDS)
+    valid_frames = {}
+    for code, df in stock_frames.items():
+        missing = required - set(df.columns)
+        if missing:
+            logger.warning(f"종목 {code} 처리 중 오류: 시그널 컬럼 없음 ({', '.join(sorted(missing))})")
+            continue
+        valid_frames[code] = df
+    stock_frames = valid_frames
+
+    if not stock_frames:
+        return {name: pd.DataFrame(columns=entry_cols) for name in signals}
+
+    codes, times, arrays = build_signal_arrays(
+        stock_frames, criteria_df,
+        BacktestConfig.SIGNAL_TIME_START, BacktestConfig.SIGNAL_TIME_END
+    )
+    codes = np.array(codes)
+
+    entries = {}
+    for name, signal in signals.items():
+        hits = np.broadcast_to(signal.evaluate(arrays), (len(codes), len(times)))
+        first = first_signal_index(hits)
+        rows = np.flatnonzero(first >= 0)
+        cols = first[rows]
+        entries[name] = pd.DataFrame({
+            '종목코드': codes[rows],
+            '시간': times[cols],
+            '현재가': arrays['현재가'][rows, cols],
+            '전일대비': arrays['전일대비'][rows, cols],
+        }, columns=entry_cols)
+
+    return entries
+
+def build_buy_watchlist(entries_df, buy_price_by_code):
+    """시그널 첫 진입 DataFrame -> 매수 종목 리스트"""
+    return [
+        {
+            '종목코드': row.종목코드,
+            '시간': row.시간,
+            '현재가': row.현재가,
+            '전일대비': row.전일대비,
+            '보유수량': buy_price_by_code // row.현재가
+        }
+        for row in entries_df.itertuples(index=False)
+    ]
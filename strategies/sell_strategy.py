@@ -1,7 +1,14 @@
 from config.backtest_config import SellStrategy, BacktestConfig
+from strategies.buy_strategy import process_minute_data
+import FinanceDataReader as fdr
 from loguru import logger
 import time as pytime
 import pandas as pd
+import numpy as np
+import os
+
+# 보유 기간 기반 청산 (포지션 일괄 계산)
+HORIZON_SELL_STRATEGIES = (SellStrategy.HOLD_MINUTES, SellStrategy.HOLD_DAYS)
 
 def find_first_target_or_stoploss(df, buy_price, buy_time):
     """장중 익절(+2%) 또는 손절(-1%) 찾기 - 최적화 버전"""
@@ -101,4 +108,118 @@ def execute_sell_strategy(strategy, info, data_df, korea_invest_api, current_tes
         profit_rate = (close_price - buy_price) / buy_price * 100
         balance += holding_qty * close_price * (1 - transaction_cost)
         logger.info(f"{current_test_date} - {code} 수익률: {profit_rate:.2f}%")
-        return profit_rate, balance
\ No newline at end of file
+        return profit_rate, balance
+
+def fetch_close_prices(codes, start_date, end_date):
+    """종목별 일봉 종가 조회 -> 종가 행렬 (일자 x 종목)"""
+    closes = {}
+    for code in codes:
+        closes[code] = fdr.DataReader(code, start=start_date, end=end_date)['Close']
+        pytime.sleep(0.05)
+    return pd.DataFrame(closes)
+
+def load_close_price_matrix(codes, start_date, end_date, path=BacktestConfig.DAILY_CLOSE_PATH):
+    """종가 행렬 (일자 x 종목) 로드 - 저장본에 없는 종목/기간만 조회해 병합 후 저장
+    조회 기간은 DataFrame.attrs['조회기간'] 에 기록 (기록이 없는 저장본은 전체 재조회)"""
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    close_df = pd.read_pickle(path) if os.path.exists(path) else pd.DataFrame()
+    cached_range = close_df.attrs.get('조회기간')
+
+    requests = []  # (종목코드 리스트, 시작일, 종료일)
+    if cached_range is None:
+        close_df = pd.DataFrame()
+        fetch_start, fetch_end = start, end
+        requests.append((list(codes), start, end))
+    else:
+        cached_start, cached_end = cached_range
+        fetch_start, fetch_end = min(start, cached_start), max(end, cached_end)
+        cached_codes = list(close_df.columns)
+        if start < cached_start:
+            requests.append((cached_codes, start, cached_start - pd.Timedelta(days=1)))
+        if end > cached_end:
+            requests.append((cached_codes, cached_end + pd.Timedelta(days=1), end))
+        missing_codes = [code for code in codes if code not in close_df.columns]
+        if missing_codes:
+            requests.append((missing_codes, fetch_start, fetch_end))
+
+    requests = [request for request in requests if request[0]]
+    if not requests:
+        return close_df
+
+    for request_codes, request_start, request_end in requests:
+        logger.info(f"종가 조회: {len(request_codes)}종목, {request_start.date()} ~ {request_end.date()}")
+        close_df = close_df.combine_first(fetch_close_prices(request_codes, request_start, request_end))
+
+    close_df = close_df.sort_index()
+    close_df.attrs['조회기간'] = (fetch_start, fetch_end)
+    close_df.to_pickle(path)
+    logger.info(f"'{path}' 종가 데이터 저장 완료!")
+    return close_df
+
+def build_minute_price_matrix(data_frames):
+    """분 단위 현재가 행렬 (자정 기준 경과 분 x 종목)"""
+    minute_prices = {}
+    for code, df in data_frames.items():
+        minute_df = process_minute_data(df)
+        minutes = minute_df['시간'].dt.hour * 60 + minute_df['시간'].dt.minute
+        minute_prices[code] = pd.Series(minute_df['현재가'].to_numpy(), index=minutes.to_numpy())
+
+    return pd.DataFrame(minute_prices).sort_index()
+
+def execute_horizon_exits(strategy, positions, close_price_df, minute_price_df, current_test_date, last_date, transaction_cost):
+    """보유 기간(N분 / N거래일) 청산 - 포지션 일괄 계산
+    HOLD_MINUTES: 매수 N분 후 현재가 (결측 분/수집 구간 이후는 직전 분 현재가, 그 이전 값도 없으면 당일 종가)
+    HOLD_DAYS: N 거래일 후 종가 (last_date 이후면 last_date 종가)"""
+    codes = [info['종목코드'] for info in positions]
+    buy_prices = np.array([info['현재가'] for info in positions], dtype=np.float64)
+    holding_qty = np.array([info['보유수량'] for info in positions], dtype=np.float64)
+
+    close_values = close_price_df.to_numpy(dtype=np.float64)
+    close_dates = close_price_df.index
+    close_cols = close_price_df.columns.get_indexer(codes)
+    buy_date_idx = close_dates.searchsorted(pd.Timestamp(current_test_date))
+    last_date_idx = close_dates.searchsorted(pd.Timestamp(last_date), side='right') - 1
+
+    def lookup_close(date_idx):
+        """date_idx 일자의 종목별 종가 (데이터 없으면 NaN)"""
+        prices = np.full(len(codes), np.nan)
+        valid = close_cols >= 0
+        if 0 <= date_idx < len(close_dates):
+            prices[valid] = close_values[date_idx, close_cols[valid]]
+        return prices
+
+    if strategy == SellStrategy.HOLD_MINUTES:
+        sell_prices = np.full(len(codes), np.nan)
+        if not minute_price_df.empty:
+            # 종목별 분 가격 전방 채움 (사이클 누락, 종목 파일이 먼저 끝난 경우)
+            minute_values = minute_price_df.reindex(columns=codes).ffill().to_numpy(dtype=np.float64)
+            buy_minutes = np.array([info['시간'].hour * 60 + info['시간'].minute for info in positions])
+            exit_rows = minute_price_df.index.searchsorted(buy_minutes + BacktestConfig.HOLDING_MINUTES)
+            exit_rows = np.minimum(exit_rows, len(minute_price_df.index) - 1)
+            sell_prices = minute_values[exit_rows, np.arange(len(codes))]
+
+        missing = np.isnan(sell_prices)
+        sell_prices[missing] = lookup_close(buy_date_idx)[missing]
+        sell_date = pd.Timestamp(current_test_date)
+    else:  # SellStrategy.HOLD_DAYS
+        exit_date_idx = max(min(buy_date_idx + BacktestConfig.HOLDING_DAYS, last_date_idx), buy_date_idx)
+        sell_prices = lookup_close(exit_date_idx)
+        sell_date = close_dates[exit_date_idx] if exit_date_idx < len(close_dates) else pd.Timestamp(current_test_date)
+
+    # 가격이 없으면 매수가로 청산 (수익률 0%)
+    missing = np.isnan(sell_prices)
+    for code in np.array(codes)[missing]:
+        logger.warning(f"{current_test_date} - {code} 매도가 없음 (종가 데이터 누락), 매수가로 청산")
+    sell_prices[missing] = buy_prices[missing]
+
+    exits_df = pd.DataFrame({
+        '종목코드': codes,
+        '보유수량': holding_qty,
+        '매수가': buy_prices,
+        '매도일': sell_date,
+        '매도가': sell_prices,
+        '수익률': (sell_prices - buy_prices) / buy_prices * 100,
+        '매도금액': holding_qty * sell_prices * (1 - transaction_cost),
+    })
+
+    return exits_df
@@ -0,0 +1,210 @@
+from src.snapshot_schema import SNAPSHOT_DTYPES
+from typing import Dict, List
+import pandas as pd
+import numpy as np
+import operator
+import re
+
+# 시그널 표현식 (예: "volume_ratio >= q3_volume & 누적강도 >= q3_strength_global & 전일대비 > 0")
+#   우선순위(낮음 -> 높음): |  <  &  <  ~  <  비교(>=, <=, >, <, ==, !=)  <  +, -  <  *, /  <  단항 -
+#   컬럼: SNAPSHOT_FIELDS (종목 x 분), CRITERIA_FIELDS (분), GLOBAL_FIELDS (스칼라)
+
+# 스냅샷 스키마의 수치 컬럼 (시간축인 '시간' 제외) + 파생 컬럼
+SNAPSHOT_FIELDS = ('volume_ratio',) + tuple(
+    col for col, dtype in SNAPSHOT_DTYPES.items() if col != '시간' and pd.api.types.is_numeric_dtype(dtype)
+)
+CRITERIA_FIELDS = ('median_volume', 'q3_volume', 'median_strength', 'q3_strength')
+GLOBAL_FIELDS = tuple(f"{col}_global" for col in CRITERIA_FIELDS)  # 기준 컬럼 전체 시간의 3분위수
+SIGNAL_FIELDS = SNAPSHOT_FIELDS + CRITERIA_FIELDS + GLOBAL_FIELDS
+
+TOKEN_PATTERN = re.compile(r"\s*(?:(?P<number>\d+\.?\d*|\.\d+)|(?P<name>[^\W\d]\w*)|(?P<op>>=|<=|==|!=|[><&|~+\-*/()]))")
+
+COMPARE_OPS = {'>=': operator.ge, '<=': operator.le, '>': operator.gt, '<': operator.lt, '==': operator.eq, '!=': operator.ne}
+ARITH_OPS = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv}
+LOGICAL_OPS = {'&': np.logical_and, '|': np.logical_or}
+
+
+def tokenize(expr: str) -> List[tuple]:
+    """표현식 -> [(종류, 값), ...]"""
+    tokens = []
+    pos = 0
+    expr = expr.rstrip()
+    while pos < len(expr):
+        match = TOKEN_PATTERN.match(expr, pos)
+        if match is None:
+            raise ValueError(f"시그널 표현식 오류: 위치 {pos} 의 '{expr[pos:].strip()[:10]}' 를 해석할 수 없습니다.")
+        kind = match.lastgroup
+        tokens.append((kind, float(match.group(kind)) if kind == 'number' else match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+def _logical(op, left, right):
+    """논리 연산 (좌항이 결과 크기의 임시 배열이면 제자리 연산)"""
+    if isinstance(left, np.ndarray) and left.shape == np.broadcast_shapes(left.shape, np.shape(right)):
+        return op(left, right, out=left)
+    return op(left, right)
+
+
+class _Parser:
+    """재귀 하강 파서 -> (결과 타입, 평가 함수) 트리"""
+    def __init__(self, expr):
+        self.expr = expr
+        self.tokens = tokenize(expr)
+        self.pos = 0
+        self.fields = set()
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _take(self, *ops):
+        kind, value = self._peek()
+        if kind == 'op' and value in ops:
+            self.pos += 1
+            return value
+        return None
+
+    def _expect_type(self, node, expected, op):
+        if node[0] != expected:
+            kind = '조건(비교식)' if expected == 'bool' else '수치'
+            raise ValueError(f"시그널 표현식 오류: '{op}' 의 피연산자는 {kind}이어야 합니다. ({self.expr})")
+
+    def parse(self):
+        node = self._or()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"시그널 표현식 오류: '{self._peek()[1]}' 이후를 해석할 수 없습니다. ({self.expr})")
+        if node[0] != 'bool':
+            raise ValueError(f"시그널 표현식 오류: 전체 표현식은 조건(비교식)이어야 합니다. ({self.expr})")
+        return node
+
+    def _binary(self, next_rule, ops, operand_type, result_type, apply):
+        left = next_rule()
+        while (op := self._take(*ops)) is not None:
+            right = next_rule()
+            self._expect_type(left, operand_type, op)
+            self._expect_type(right, operand_type, op)
+            left = (result_type, apply(op, left[1], right[1]))
+        return left
+
+    def _or(self):
+        return self._binary(self._and, ('|',), 'bool', 'bool',
+                            lambda op, l, r: lambda arrays: _logical(LOGICAL_OPS[op], l(arrays), r(arrays)))
+
+    def _and(self):
+        return self._binary(self._not, ('&',), 'bool', 'bool',
+                            lambda op, l, r: lambda arrays: _logical(LOGICAL_OPS[op], l(arrays), r(arrays)))
+
+    def _not(self):
+        if self._take('~'):
+            node = self._not()
+            self._expect_type(node, 'bool', '~')
+            return 'bool', lambda arrays, f=node[1]: np.logical_not(f(arrays))
+        return self._comparison()
+
+    def _comparison(self):
+        left = self._arith()
+        op = self._take(*COMPARE_OPS)
+        if op is None:
+            return left
+        right = self._arith()
+        self._expect_type(left, 'num', op)
+        self._expect_type(right, 'num', op)
+        return 'bool', lambda arrays, f=COMPARE_OPS[op], l=left[1], r=right[1]: f(l(arrays), r(arrays))
+
+    def _arith(self):
+        return self._binary(self._term, ('+', '-'), 'num', 'num',
+                            lambda op, l, r: lambda arrays, f=ARITH_OPS[op]: f(l(arrays), r(arrays)))
+
+    def _term(self):
+        return self._binary(self._unary, ('*', '/'), 'num', 'num',
+                            lambda op, l, r: lambda arrays, f=ARITH_OPS[op]: f(l(arrays), r(arrays)))
+
+    def _unary(self):
+        if self._take('-'):
+            node = self._unary()
+            self._expect_type(node, 'num', '-')
+            return 'num', lambda arrays, f=node[1]: -f(arrays)
+        return self._atom()
+
+    def _atom(self):
+        kind, value = self._peek()
+        if kind == 'number':
+            self.pos += 1
+            return 'num', lambda arrays, v=value: v
+        if kind == 'name':
+            if value not in SIGNAL_FIELDS:
+                raise ValueError(f"시그널 표현식 오류: 알 수 없는 컬럼 '{value}' (사용 가능: {', '.join(SIGNAL_FIELDS)})")
+            self.pos += 1
+            self.fields.add(value)
+            return 'num', lambda arrays, name=value: arrays[name]
+        if self._take('('):
+            node = self._or()
+            if not self._take(')'):
+                raise ValueError(f"시그널 표현식 오류: 괄호가 닫히지 않았습니다. ({self.expr})")
+            return node
+        raise ValueError(f"시그널 표현식 오류: 피연산자가 필요합니다. ({self.expr})")
+
+
+class CompiledSignal:
+    """파싱/검증이 끝난 시그널 (배열 입력으로 반복 평가)"""
+    def __init__(self, expr: str):
+        parser = _Parser(expr)
+        self.expr = expr
+        self._evaluate = parser.parse()[1]
+        self.fields = frozenset(parser.fields)
+
+    def evaluate(self, arrays: Dict[str, np.ndarray]) -> np.ndarray:
+        """(종목 x 분) 조건 충족 여부"""
+        missing = self.fields - arrays.keys()
+        if missing:
+            raise KeyError(f"시그널 입력에 컬럼이 없습니다: {', '.join(sorted(missing))}")
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.asarray(self._evaluate(arrays), dtype=bool)
+
+    def __repr__(self):
+        return f"CompiledSignal({self.expr!r})"
+
+
+def compile_signal(expr: str) -> CompiledSignal:
+    """시그널 표현식 파싱 및 검증 (1회)"""
+    return CompiledSignal(expr)
+
+
+def global_criteria_values(criteria_df: pd.DataFrame) -> Dict[str, float]:
+    """전체 시간 기준값 (기준 컬럼별 3분위수)"""
+    return {
+        f"{col}_global": criteria_df[col].quantile(0.75)
+        for col in CRITERIA_FIELDS if col in criteria_df.columns
+    }
+
+
+def build_signal_arrays(stock_frames: Dict[str, pd.DataFrame], criteria_df: pd.DataFrame,
+                        time_start=None, time_end=None) -> tuple:
+    """종목별 분 단위 DataFrame -> (종목코드, 시간, {컬럼: (종목 x 분) 배열})
+    시간축은 criteria_df 의 '시간' (time_start ~ time_end 구간), 전역 기준값은 전체 시간 기준"""
+    times = criteria_df['시간']
+    in_range = np.ones(len(times), dtype=bool)
+    if time_start is not None and time_end is not None:
+        in_range = times.between(time_start, time_end).to_numpy()
+    time_values = times[in_range].to_numpy()
+
+    codes = list(stock_frames)
+    arrays = global_criteria_values(criteria_df)
+    for col in CRITERIA_FIELDS:
+        if col in criteria_df.columns:
+            arrays[col] = criteria_df[col].to_numpy(dtype=np.float64)[in_range][np.newaxis, :]
+
+    indexed = [df.drop_duplicates(subset=['시간']).set_index('시간').reindex(time_values) for df in stock_frames.values()]
+    for col in SNAPSHOT_FIELDS:
+        if indexed and all(col in df.columns for df in indexed):
+            arrays[col] = np.vstack([df[col].to_numpy(dtype=np.float64) for df in indexed])
+
+    return codes, time_values, arrays
+
+
+def first_signal_index(hits: np.ndarray) -> np.ndarray:
+    """종목별 첫 충족 분 인덱스 (없으면 -1)"""
+    hits = np.atleast_2d(hits)
+    first = hits.argmax(axis=1)
+    first[~hits.any(axis=1)] = -1
+    return first
@@ -0,0 +1,167 @@
+from config.backtest_config import BacktestConfig
+from utils.sliding_quantile import SlidingQuantile
+from collections import defaultdict, deque
+from typing import Optional
+from pathlib import Path
+from loguru import logger
+import pandas as pd
+import numpy as np
+import sys
+
+def parse_column_date(col) -> Optional[pd.Timestamp]:
+    """'종목코드_YYYYMMDD' 형식 컬럼명에서 날짜 추출"""
+    try:
+        return pd.to_datetime(col.split('_')[1], format='%Y%m%d')
+    except (IndexError, ValueError, AttributeError):
+        return None
+
+def group_columns_by_day(columns) -> dict:
+    """컬럼명을 일자별로 그룹화 {일자: [컬럼, ...]}"""
+    columns_by_day = defaultdict(list)
+    for col in columns:
+        col_date = parse_column_date(col)
+        if col_date is not None:
+            columns_by_day[col_date].append(col)
+    return columns_by_day
+
+def partition_criteria_by_day(parquet_path, output_dir):
+    """기준 데이터(시간 x 종목_일자) parquet 를 일자별 파일로 분할"""
+    df = pd.read_parquet(parquet_path)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    columns_by_day = group_columns_by_day(df.columns)
+    for col_date, cols in sorted(columns_by_day.items()):
+        df[['시간'] + cols].to_parquet(output_dir / f"{col_date.strftime('%Y%m%d')}.parquet", index=False)
+
+    logger.info(f"'{parquet_path}' -> '{output_dir}' 일자별 분할 완료 ({len(columns_by_day)}일)")
+
+def partition_volume_by_month(pickle_path, output_dir):
+    """일별 거래량(일자 x 종목) pickle 을 월별 parquet 로 분할"""
+    df = pd.read_pickle(pickle_path)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    months = df.index.to_period('M')
+    for month in months.unique():
+        df[months == month].to_parquet(output_dir / f"{month.strftime('%Y%m')}.parquet")
+
+    logger.info(f"'{pickle_path}' -> '{output_dir}' 월별 분할 완료 ({months.nunique()}개월)")
+
+def get_peak_rss_mb() -> float:
+    """프로세스 최대 메모리 사용량(Peak RSS, MB)"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return float('nan')
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: bytes
+    return peak_rss / (1024 * 1024) if sys.platform == 'darwin' else peak_rss / 1024
+
+
+class StreamingCriteria:
+    """일자별 파티션을 순차적으로 읽어 기준(중위수, 3분위수) 계산
+    window_days 가 None 이면 누적(expanding), 정수이면 최근 N 일자(rolling) 기준"""
+    def __init__(self, source, start_date, window_days=None):
+        self.source = source
+        self.window_days = window_days
+        self.pending_days = deque((day, key) for day, key in self._list_days() if day >= start_date)  # 아직 반영하지 않은 일자
+        self.time_values = self._load_time_values() if self.pending_days else None  # 기준 시간축
+        self.window_blocks = deque()  # rolling: 윈도우 내 일자별 (시간 x 종목) 배열
+        self.n_days = 0
+        self.sliding_quantile = SlidingQuantile(0 if self.time_values is None else len(self.time_values))
+
+    def _list_days(self):
+        for path in sorted(Path(self.source).glob('*.parquet')):
+            yield pd.to_datetime(path.stem, format='%Y%m%d'), path
+
+    def _load_time_values(self):
+        time_df = pd.read_parquet(self.pending_days[0][1], columns=['시간'])
+        return time_df['시간'].drop_duplicates().to_numpy()
+
+    def _load_day(self, path):
+        day_df = pd.read_parquet(path).drop_duplicates(subset=['시간'], keep='first')
+        values = day_df.set_index('시간').reindex(self.time_values)
+        return values.to_numpy(dtype=np.float64)
+
+    def advance(self, end_date):
+        """end_date 까지의 일자 반영 (rolling 이면 윈도우 밖 일자 삭제)"""
+        while self.pending_days and self.pending_days[0][0] <= end_date:
+            _, key = self.pending_days.popleft()
+            block = self._load_day(key)
+            self.sliding_quantile.insert(block)
+            self.n_days += 1
+
+            if self.window_days is not None:
+                self.window_blocks.append(block)
+                if len(self.window_blocks) > self.window_days:
+                    self.sliding_quantile.remove(self.window_blocks.popleft())
+                    self.n_days -= 1
+        return self
+
+    def criteria_df(self) -> pd.DataFrame:
+        """현재 윈도우 기준 중위수/3분위수"""
+        if self.time_values is None:
+            return pd.DataFrame({'시간': [], 'median': [], 'q3': []})
+
+        if self.n_days == 0:
+            return pd.DataFrame({'시간': self.time_values, 'median': 0, 'q3': 0})
+
+        return pd.DataFrame({
+            '시간': self.time_values,
+            'median': self.sliding_quantile.quantile(0.5),
+            'q3': self.sliding_quantile.quantile(0.75),
+        })
+
+
+class InMemoryCriteria(StreamingCriteria):
+    """단일 parquet 를 1회 로드한 뒤 StreamingCriteria 와 동일하게 일자 순 처리"""
+    def __init__(self, parquet_path, start_date, window_days=None):
+        self.df = pd.read_parquet(parquet_path).drop_duplicates(subset=['시간'], keep='first')
+        super().__init__(parquet_path, start_date, window_days)
+
+    def _list_days(self):
+        return sorted(group_columns_by_day(self.df.columns).items())
+
+    def _load_time_values(self):
+        return self.df['시간'].to_numpy()
+
+    def _load_day(self, columns):
+        return self.df[columns].to_numpy(dtype=np.float64)
+
+
+class StreamingVolumeWindow:
+    """월별 거래량 파티션에서 최근 window_size 거래일 + 당일만 메모리 보관"""
+    def __init__(self, partition_dir, window_size):
+        self.window_size = window_size
+        self.pending_months = sorted(Path(partition_dir).glob('*.parquet'))
+        self.buffer = None
+
+    def frame_until(self, current_date) -> pd.DataFrame:
+        """current_date 까지의 최근 (window_size + 1) 거래일 거래량"""
+        current_date = pd.to_datetime(current_date)
+        current_month = current_date.strftime('%Y%m')
+
+        loaded = [] if self.buffer is None else [self.buffer]
+        while self.pending_months and self.pending_months[0].stem <= current_month:
+            loaded.append(pd.read_parquet(self.pending_months.pop(0)))
+        if not loaded:
+            return pd.DataFrame()
+        self.buffer = pd.concat(loaded) if len(loaded) > 1 else loaded[0]
+
+        # 윈도우 이전 데이터 제거
+        n_until = int((self.buffer.index <= current_date).sum())
+        self.buffer = self.buffer.iloc[max(0, n_until - (self.window_size + 1)):]
+
+        return self.buffer.loc[:current_date]
+
+
+if __name__ == "__main__":
+    window = BacktestConfig.VOLUME_WINDOW_SIZE
+    partition_criteria_by_day(
+        BacktestConfig.VOLUME_RATIO_PATH_TEMPLATE.format(window=window),
+        BacktestConfig.VOLUME_RATIO_PARTITION_TEMPLATE.format(window=window)
+    )
+    partition_criteria_by_day(BacktestConfig.STRENGTH_DATA_PATH, BacktestConfig.STRENGTH_PARTITION_PATH)
+    partition_volume_by_month(BacktestConfig.DAILY_VOLUME_PATH, BacktestConfig.DAILY_VOLUME_PARTITION_PATH)
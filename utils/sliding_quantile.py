@@ -0,0 +1,40 @@
+import numpy as np
+
+class SlidingQuantile:
+    """행(시간)별 정렬 배열 기반 슬라이딩 윈도우 분위수 - 일자 컬럼 단위 추가/삭제"""
+    def __init__(self, n_rows):
+        self.sorted_rows = [np.empty(0, dtype=np.float64) for _ in range(n_rows)]
+
+    def insert(self, block):
+        """(행 x 컬럼) 블록의 값 추가 (NaN 제외)"""
+        for i, row in enumerate(np.asarray(block, dtype=np.float64)):
+            values = np.sort(row[~np.isnan(row)])
+            if values.size == 0:
+                continue
+            sorted_row = self.sorted_rows[i]
+            self.sorted_rows[i] = np.insert(sorted_row, np.searchsorted(sorted_row, values), values)
+
+    def remove(self, block):
+        """insert 했던 블록의 값 삭제 (NaN 제외)"""
+        for i, row in enumerate(np.asarray(block, dtype=np.float64)):
+            values = np.sort(row[~np.isnan(row)])
+            if values.size == 0:
+                continue
+            sorted_row = self.sorted_rows[i]
+            # 중복값은 같은 값 내 순번만큼 위치를 밀어 서로 다른 원소를 삭제
+            positions = np.searchsorted(sorted_row, values, side='left')
+            positions += np.arange(values.size) - np.searchsorted(values, values, side='left')
+            self.sorted_rows[i] = np.delete(sorted_row, positions)
+
+    def quantile(self, q) -> np.ndarray:
+        """행별 분위수 (선형 보간, pandas 기본값과 동일 / 값이 없으면 NaN)"""
+        result = np.full(len(self.sorted_rows), np.nan)
+        for i, sorted_row in enumerate(self.sorted_rows):
+            n = sorted_row.size
+            if n == 0:
+                continue
+            position = q * (n - 1)
+            lower = int(np.floor(position))
+            upper = min(lower + 1, n - 1)
+            result[i] = sorted_row[lower] + (sorted_row[upper] - sorted_row[lower]) * (position - lower)
+        return result